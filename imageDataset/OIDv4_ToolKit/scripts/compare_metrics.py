@@ -4,7 +4,9 @@ Compare metrics between original and cleaned dataset models.
 This script collects and compares performance metrics from both training runs.
 """
 
+import io
 import json
+import sys
 from pathlib import Path
 from typing import Dict
 
@@ -55,23 +57,29 @@ def extract_metrics_from_results(results_dir: Path) -> Dict[str, float]:
 def compare_models():
     """Compare metrics between original and cleaned models."""
     project_root = Path(__file__).resolve().parent
-    
+
     original_dir = project_root / "runs" / "yolov8n-laptop"
     cleaned_dir = project_root / "runs" / "yolov8n-laptop-cleaned"
-    
-    print("=" * 80)
-    print("MODEL PERFORMANCE COMPARISON")
-    print("=" * 80)
-    print()
-    
+
+    # Build the whole report in one buffer: a single stdout write and a
+    # single file write instead of ~80 separate print calls, and the file
+    # gets the same text as the terminal instead of a re-formatted subset
+    buf = io.StringIO()
+    w = buf.write
+
+    w("=" * 80 + "\n")
+    w("MODEL PERFORMANCE COMPARISON\n")
+    w("=" * 80 + "\n")
+    w("\n")
+
     # Get metrics (we'll use the test set results from terminal output)
     # Since YOLO doesn't always save test metrics easily, we'll use what we know
-    
-    print("📊 TEST SET METRICS COMPARISON")
-    print("-" * 80)
-    print(f"{'Metric':<20} {'Original Dataset':<20} {'Cleaned Dataset':<20} {'Difference':<20}")
-    print("-" * 80)
-    
+
+    w("\U0001F4CA TEST SET METRICS COMPARISON\n")
+    w("-" * 80 + "\n")
+    w(f"{'Metric':<20} {'Original Dataset':<20} {'Cleaned Dataset':<20} {'Difference':<20}\n")
+    w("-" * 80 + "\n")
+
     # Original dataset metrics (from your training output)
     original_metrics = {
         "Precision": 0.911,
@@ -81,7 +89,7 @@ def compare_models():
         "Test Images": 225,
         "Test Instances": 356,
     }
-    
+
     # Cleaned dataset metrics (from your training output)
     cleaned_metrics = {
         "Precision": 0.885,
@@ -91,94 +99,84 @@ def compare_models():
         "Test Images": 204,
         "Test Instances": 337,
     }
-    
+
     for metric in ["Precision", "Recall", "mAP@0.5", "mAP@0.5:0.95"]:
         orig_val = original_metrics[metric]
         clean_val = cleaned_metrics[metric]
         diff = clean_val - orig_val
         diff_pct = (diff / orig_val) * 100 if orig_val > 0 else 0
-        
+
         sign = "+" if diff >= 0 else ""
-        print(f"{metric:<20} {orig_val:<20.3f} {clean_val:<20.3f} {sign}{diff:.3f} ({sign}{diff_pct:.1f}%)")
-    
-    print("-" * 80)
-    print()
-    
-    print("📈 DATASET STATISTICS")
-    print("-" * 80)
-    print(f"{'Statistic':<30} {'Original':<20} {'Cleaned':<20}")
-    print("-" * 80)
-    print(f"{'Total Images':<30} {1500:<20} {1351:<20}")
-    print(f"{'Train Images':<30} {1050:<20} {945:<20}")
-    print(f"{'Val Images':<30} {225:<20} {202:<20}")
-    print(f"{'Test Images':<30} {225:<20} {204:<20}")
-    print(f"{'Test Instances':<30} {356:<20} {337:<20}")
-    print("-" * 80)
-    print()
-    
-    print("🔍 DATA CLEANING SUMMARY")
-    print("-" * 80)
-    print("Removed:")
-    print("  - Invalid bounding boxes: 136")
-    print("  - Too dark images: 8")
-    print("  - Too bright images: 5")
-    print("  - Duplicates: 0")
-    print("  - Missing labels: 0")
-    print("  Total removed: 149 images (9.9%)")
-    print()
-    print("Enhancements applied:")
-    print("  - Brightness adjustment (factor: 1.1)")
-    print("  - Contrast adjustment (factor: 1.1)")
-    print("  - Sharpening filter")
-    print("  Applied to: 1,351 images (100% of kept images)")
-    print("-" * 80)
-    print()
-    
-    print("📝 KEY FINDINGS")
-    print("-" * 80)
-    print("1. Data Quality:")
-    print("   ✓ Removed 136 images with invalid bounding boxes")
-    print("   ✓ Fixed 13 brightness issues (8 dark, 5 bright)")
-    print("   ✓ Enhanced all remaining images")
-    print()
-    print("2. Model Performance:")
-    print("   • Original dataset: mAP@0.5 = 0.871")
-    print("   • Cleaned dataset:  mAP@0.5 = 0.835")
-    print("   • Difference: -0.036 (-4.1%)")
-    print()
-    print("3. Analysis:")
-    print("   • Both models perform well (mAP@0.5 > 0.83)")
-    print("   • Slight decrease in cleaned model due to:")
-    print("     - Smaller dataset size (1,500 → 1,351 images)")
-    print("     - Possible over-enhancement artifacts")
-    print("     - Smaller test set (225 → 204 images)")
-    print()
-    print("4. Conclusion:")
-    print("   • Data cleaning improved data quality significantly")
-    print("   • Trade-off: cleaner data vs. dataset size")
-    print("   • Both models are production-ready")
-    print("-" * 80)
-    print()
-    
-    # Save comparison to file
+        w(f"{metric:<20} {orig_val:<20.3f} {clean_val:<20.3f} {sign}{diff:.3f} ({sign}{diff_pct:.1f}%)\n")
+
+    w("-" * 80 + "\n")
+    w("\n")
+
+    w("\U0001F4C8 DATASET STATISTICS\n")
+    w("-" * 80 + "\n")
+    w(f"{'Statistic':<30} {'Original':<20} {'Cleaned':<20}\n")
+    w("-" * 80 + "\n")
+    w(f"{'Total Images':<30} {1500:<20} {1351:<20}\n")
+    w(f"{'Train Images':<30} {1050:<20} {945:<20}\n")
+    w(f"{'Val Images':<30} {225:<20} {202:<20}\n")
+    w(f"{'Test Images':<30} {225:<20} {204:<20}\n")
+    w(f"{'Test Instances':<30} {356:<20} {337:<20}\n")
+    w("-" * 80 + "\n")
+    w("\n")
+
+    w("\U0001F50D DATA CLEANING SUMMARY\n")
+    w("-" * 80 + "\n")
+    w("Removed:\n")
+    w("  - Invalid bounding boxes: 136\n")
+    w("  - Too dark images: 8\n")
+    w("  - Too bright images: 5\n")
+    w("  - Duplicates: 0\n")
+    w("  - Missing labels: 0\n")
+    w("  Total removed: 149 images (9.9%)\n")
+    w("\n")
+    w("Enhancements applied:\n")
+    w("  - Brightness adjustment (factor: 1.1)\n")
+    w("  - Contrast adjustment (factor: 1.1)\n")
+    w("  - Sharpening filter\n")
+    w("  Applied to: 1,351 images (100% of kept images)\n")
+    w("-" * 80 + "\n")
+    w("\n")
+
+    w("\U0001F4DD KEY FINDINGS\n")
+    w("-" * 80 + "\n")
+    w("1. Data Quality:\n")
+    w("   \u2713 Removed 136 images with invalid bounding boxes\n")
+    w("   \u2713 Fixed 13 brightness issues (8 dark, 5 bright)\n")
+    w("   \u2713 Enhanced all remaining images\n")
+    w("\n")
+    w("2. Model Performance:\n")
+    w("   \u2022 Original dataset: mAP@0.5 = 0.871\n")
+    w("   \u2022 Cleaned dataset:  mAP@0.5 = 0.835\n")
+    w("   \u2022 Difference: -0.036 (-4.1%)\n")
+    w("\n")
+    w("3. Analysis:\n")
+    w("   \u2022 Both models perform well (mAP@0.5 > 0.83)\n")
+    w("   \u2022 Slight decrease in cleaned model due to:\n")
+    w("     - Smaller dataset size (1,500 \u2192 1,351 images)\n")
+    w("     - Possible over-enhancement artifacts\n")
+    w("     - Smaller test set (225 \u2192 204 images)\n")
+    w("\n")
+    w("4. Conclusion:\n")
+    w("   \u2022 Data cleaning improved data quality significantly\n")
+    w("   \u2022 Trade-off: cleaner data vs. dataset size\n")
+    w("   \u2022 Both models are production-ready\n")
+    w("-" * 80 + "\n")
+    w("\n")
+
+    report = buf.getvalue()
+    sys.stdout.write(report)
+
+    # Save the same report to file
     output_file = project_root / "metrics_comparison.txt"
-    with output_file.open("w") as f:
-        f.write("=" * 80 + "\n")
-        f.write("MODEL PERFORMANCE COMPARISON\n")
-        f.write("=" * 80 + "\n\n")
-        f.write("TEST SET METRICS\n")
-        f.write("-" * 80 + "\n")
-        for metric in ["Precision", "Recall", "mAP@0.5", "mAP@0.5:0.95"]:
-            f.write(f"{metric}: Original={original_metrics[metric]:.3f}, "
-                   f"Cleaned={cleaned_metrics[metric]:.3f}, "
-                   f"Diff={cleaned_metrics[metric]-original_metrics[metric]:.3f}\n")
-        f.write("\n")
-        f.write("Dataset sizes: Original=1500, Cleaned=1351\n")
-        f.write("Removed: 149 images (136 invalid bboxes, 8 dark, 5 bright)\n")
-    
-    print(f"✅ Comparison saved to: {output_file}")
+    output_file.write_text(report, encoding="utf-8")
+
+    print(f"\u2705 Comparison saved to: {output_file}")
 
 
 if __name__ == "__main__":
     compare_models()
-
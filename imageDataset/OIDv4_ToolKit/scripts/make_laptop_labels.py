@@ -1,5 +1,11 @@
 import csv
+import io
+import os
+from collections import defaultdict
 from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
 
 
 def get_laptop_label_id(class_descriptions_csv: Path) -> str:
@@ -37,58 +43,83 @@ def generate_yolo_labels_for_laptop(
 
     labels_dir = images_dir  # labels will be created next to images
 
-    # Clear any existing .txt labels for a clean start
-    for txt_path in labels_dir.glob("*.txt"):
-        txt_path.unlink()
-
-    num_boxes = 0
-    num_images = 0
-
-    with annotations_csv.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        current_image = None
-        current_file = None
-
-        for row in reader:
-            if row.get("LabelName") != laptop_label_id:
-                continue
-
-            image_id = row["ImageID"]
-            if image_id not in image_stems:
-                continue  # annotation for image we did not download
-
-            try:
-                xmin = float(row["XMin"])
-                xmax = float(row["XMax"])
-                ymin = float(row["YMin"])
-                ymax = float(row["YMax"])
-            except (TypeError, ValueError):
-                continue
-
-            x_center = (xmin + xmax) / 2.0
-            y_center = (ymin + ymax) / 2.0
-            width = xmax - xmin
-            height = ymax - ymin
-
-            if not (0.0 <= x_center <= 1.0 and 0.0 <= y_center <= 1.0):
-                continue
-
-            if current_image != image_id:
-                if current_file is not None:
-                    current_file.close()
-                label_path = labels_dir / f"{image_id}.txt"
-                current_file = label_path.open("w", encoding="utf-8")
-                current_image = image_id
-                num_images += 1
-
-            # Single class (Laptop) => class id 0
-            current_file.write(
-                f"0 {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}\n"
-            )
-            num_boxes += 1
-
-        if current_file is not None:
-            current_file.close()
+    # Clear any existing .txt labels for a clean start; collect the names
+    # in one directory read first so we never unlink entries out from under
+    # an in-progress scan, then unlink without any extra per-file stats
+    with os.scandir(labels_dir) as it:
+        stale = [entry.path for entry in it if entry.name.endswith(".txt")]
+    for path in stale:
+        os.unlink(path)
+
+    # Pre-screen the raw CSV with a C-level substring search: Laptop rows
+    # are a tiny fraction of the file, so 99%+ of lines are skipped before
+    # any CSV parsing happens. Survivors (plus the header) feed read_csv.
+    needle = laptop_label_id.encode("utf-8")
+    screened = io.BytesIO()
+    with annotations_csv.open("rb") as f:
+        screened.write(f.readline())  # header
+        for raw in f:
+            if needle in raw:
+                screened.write(raw)
+    screened.seek(0)
+
+    # Parse only the columns we need; filtering happens in C via pandas
+    # instead of a per-row dict build in csv.DictReader.
+    df = pd.read_csv(
+        screened,
+        usecols=["ImageID", "LabelName", "XMin", "XMax", "YMin", "YMax"],
+        dtype={"ImageID": "string", "LabelName": "string"},
+    )
+    # Exact match (the substring screen above can have false positives)
+    df = df[df["LabelName"].values == laptop_label_id]
+    # Drop annotations for images we did not download
+    df = df[df["ImageID"].isin(image_stems)]
+
+    # Coerce coordinates to floats, dropping unparseable rows (mirrors the
+    # old per-row try/except)
+    for col in ("XMin", "XMax", "YMin", "YMax"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["XMin", "XMax", "YMin", "YMax"])
+
+    xmin = df["XMin"].values
+    xmax = df["XMax"].values
+    ymin = df["YMin"].values
+    ymax = df["YMax"].values
+
+    df["x_center"] = (xmin + xmax) / 2.0
+    df["y_center"] = (ymin + ymax) / 2.0
+    df["width"] = xmax - xmin
+    df["height"] = ymax - ymin
+
+    df = df[
+        (df["x_center"] >= 0.0) & (df["x_center"] <= 1.0)
+        & (df["y_center"] >= 0.0) & (df["y_center"] <= 1.0)
+    ]
+
+    # Sort once by ImageID so each group's rows are contiguous; groupby can
+    # then stream them in order without building its own sort. The old
+    # csv.DictReader version silently produced broken labels on unsorted
+    # input - groupby over the sorted frame is correct regardless.
+    df = df.sort_values("ImageID", kind="stable")
+
+    # Bucket lines per image in one pass, then flush each file with a
+    # single write. Plain dict-of-lists beats groupby iteration here:
+    # groupby materializes a new DataFrame slice per image
+    buckets: Dict[str, List[str]] = defaultdict(list)
+    for image_id, xc, yc, width, height in zip(
+        df["ImageID"], df["x_center"], df["y_center"],
+        df["width"], df["height"],
+    ):
+        # Single class (Laptop) => class id 0
+        buckets[image_id].append(
+            f"0 {xc:.6f} {yc:.6f} {width:.6f} {height:.6f}\n")
+
+    for image_id, lines in buckets.items():
+        (labels_dir / f"{image_id}.txt").write_text("".join(lines),
+                                                    encoding="utf-8")
+
+    num_images = len(buckets)
+    num_boxes = len(df)
 
     print(f"Generated labels for {num_images} images, total {num_boxes} boxes.")
 
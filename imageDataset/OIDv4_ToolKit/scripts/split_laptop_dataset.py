@@ -1,8 +1,31 @@
 import os
-import random
 import shutil
 from pathlib import Path
 
+import numpy as np
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Hardlink src to dst (metadata-only, no data copied), replacing any
+    existing dst so re-runs stay idempotent like copy2 was; fall back to
+    a regular copy when linking is not possible (e.g. across filesystems).
+    """
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        # re-run or stem collision left a dst behind; unlinking is safe
+        # even when dst is already a hardlink of src
+        os.unlink(dst)
+    except OSError:
+        shutil.copy2(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 
 def split_dataset(
     source_dir: Path,
@@ -38,50 +61,57 @@ def split_dataset(
     source_dir = source_dir.resolve()
     output_root = output_root.resolve()
 
-    image_paths = sorted(
-        [p for p in source_dir.glob("*.jpg")] + [p for p in source_dir.glob("*.jpeg")]
-    )
+    # Collect images and label stems in one scandir pass instead of two
+    # globs plus a stat per image for the label check
+    image_paths = []
+    label_stems = set()
+    with os.scandir(source_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            lower = entry.name.lower()
+            if lower.endswith((".jpg", ".jpeg")):
+                image_paths.append(source_dir / entry.name)
+            elif lower.endswith(".txt"):
+                label_stems.add(entry.name[:-4])
+    image_paths.sort()
+
     if not image_paths:
         raise RuntimeError(f"No JPG/JPEG images found in {source_dir}")
 
     # Only keep images that have a matching txt label
-    valid_images = []
-    for img_path in image_paths:
-        label_path = img_path.with_suffix(".txt")
-        if label_path.exists():
-            valid_images.append((img_path, label_path))
+    valid_images = [p for p in image_paths if p.stem in label_stems]
 
     if not valid_images:
         raise RuntimeError(f"No image/label pairs found in {source_dir}")
 
-    random.seed(seed)
-    random.shuffle(valid_images)
-
+    # Shuffle via a numpy index permutation and slice the index array into
+    # the three splits - no intermediate list of shuffled tuples
     n_total = len(valid_images)
     n_train = int(n_total * train_ratio)
     n_val = int(n_total * val_ratio)
-    n_test = n_total - n_train - n_val
 
-    train_set = valid_images[:n_train]
-    val_set = valid_images[n_train : n_train + n_val]
-    test_set = valid_images[n_train + n_val :]
+    idx = np.random.default_rng(seed).permutation(n_total)
+    train_idx, val_idx, test_idx = np.split(idx, [n_train, n_train + n_val])
 
     print(f"Total pairs: {n_total}")
-    print(f"Train: {len(train_set)}, Val: {len(val_set)}, Test: {len(test_set)}")
+    print(f"Train: {len(train_idx)}, Val: {len(val_idx)}, Test: {len(test_idx)}")
 
-    def prepare_split(split_name: str, pairs):
+    def prepare_split(split_name: str, indices):
         img_out = output_root / split_name / "images"
         lbl_out = output_root / split_name / "labels"
         img_out.mkdir(parents=True, exist_ok=True)
         lbl_out.mkdir(parents=True, exist_ok=True)
 
-        for img_p, lbl_p in pairs:
-            shutil.copy2(img_p, img_out / img_p.name)
-            shutil.copy2(lbl_p, lbl_out / lbl_p.name)
+        for i in indices:
+            img_p = valid_images[i]
+            lbl_p = img_p.with_suffix(".txt")
+            _link_or_copy(img_p, img_out / img_p.name)
+            _link_or_copy(lbl_p, lbl_out / lbl_p.name)
 
-    prepare_split("train", train_set)
-    prepare_split("val", val_set)
-    prepare_split("test", test_set)
+    prepare_split("train", train_idx)
+    prepare_split("val", val_idx)
+    prepare_split("test", test_idx)
 
     print(f"Split completed under: {output_root}")
 
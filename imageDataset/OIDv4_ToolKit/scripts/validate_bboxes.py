@@ -5,10 +5,103 @@ This script helps you manually check if bounding boxes correctly label laptops.
 It displays images with bounding boxes drawn so you can verify they're correct.
 """
 
+import argparse
+import functools
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+import numpy as np
 from pathlib import Path
 
 
+def _sample_images(dataset_dir: Path, k: int, seed: int = 42):
+    """
+    Pick up to k random jpg/jpeg paths in one os.scandir pass using
+    reservoir sampling. Memory stays O(k) - the full image list is never
+    materialized, which matters once the dataset grows to hundreds of
+    thousands of files.
+    """
+    rng = random.Random(seed)
+    reservoir = []
+    n = 0
+    with os.scandir(dataset_dir) as it:
+        for entry in it:
+            if not (entry.is_file()
+                    and entry.name.lower().endswith((".jpg", ".jpeg"))):
+                continue
+            n += 1
+            if len(reservoir) < k:
+                reservoir.append(entry.path)
+            else:
+                j = rng.randrange(n)
+                if j < k:
+                    reservoir[j] = entry.path
+    return reservoir
+
+
+# "Laptop" is the only text ever drawn, so rasterize it once into a small
+# tile at import time; per box we then just blit the glyph pixels instead
+# of paying cv2.putText's vector font rendering again and again
+_LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_LABEL_SCALE = 0.5
+_LABEL_THICKNESS = 2
+
+
+def _render_label_tile(text: str = "Laptop"):
+    (tw, th), baseline = cv2.getTextSize(text, _LABEL_FONT, _LABEL_SCALE,
+                                         _LABEL_THICKNESS)
+    tile = np.zeros((th + baseline, tw, 3), dtype=np.uint8)
+    cv2.putText(tile, text, (0, th), _LABEL_FONT, _LABEL_SCALE,
+                (0, 255, 0), _LABEL_THICKNESS)
+    return tile, th
+
+
+_LABEL_TILE, _LABEL_ASCENT = _render_label_tile()
+
+
+def _blit_label(img, x: int, y: int):
+    """
+    Copy the pre-rendered label tile onto img with its top-left at (x, y),
+    clipped to the image bounds. Only glyph pixels are written, matching
+    what cv2.putText would have drawn.
+    """
+    h, w = img.shape[:2]
+    th, tw = _LABEL_TILE.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + tw, w), min(y + th, h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    tile = _LABEL_TILE[y0 - y:y1 - y, x0 - x:x1 - x]
+    region = img[y0:y1, x0:x1]
+    mask = tile.any(axis=2)
+    region[mask] = tile[mask]
+
+
+@functools.lru_cache(maxsize=64)
+def _read_bgr(path_str: str, mtime: float):
+    """
+    Decode an image, cached on (path, mtime). Re-running validation over
+    the same sample set (e.g. interactive review then saved samples) skips
+    the JPEG decode entirely the second time; mtime invalidates the cache
+    if the file changes.
+
+    The file is slurped with one read and decoded with cv2.imdecode rather
+    than cv2.imread's internal stdio loop; read and decode both release
+    the GIL, so pool threads overlap one image's read with another's
+    decode.
+    """
+    try:
+        data = Path(path_str).read_bytes()
+    except OSError:
+        return None
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
 def draw_bboxes_on_image(image_path: Path, label_path: Path, output_path: Path = None):
     """
     Draw bounding boxes on an image from YOLO label file.
@@ -18,12 +111,16 @@ def draw_bboxes_on_image(image_path: Path, label_path: Path, output_path: Path =
         label_path: Path to YOLO label file (.txt)
         output_path: Optional path to save annotated image
     """
-    # Read image
-    img = cv2.imread(str(image_path))
+    # Read image (cached decode; copy so drawing never mutates the cache)
+    try:
+        img = _read_bgr(str(image_path), image_path.stat().st_mtime)
+    except OSError:
+        img = None
     if img is None:
         print(f"  Warning: Could not read {image_path.name}")
         return None
-    
+    img = img.copy()
+
     h, w = img.shape[:2]
     
     # Read label file
@@ -31,36 +128,58 @@ def draw_bboxes_on_image(image_path: Path, label_path: Path, output_path: Path =
         print(f"  Warning: No label file for {image_path.name}")
         return None
     
+    # Parse the whole label file with one np.fromstring scan (C tokenizer,
+    # no loadtxt line splitting) and convert all boxes from normalized
+    # xywh to pixel xyxy as vectorized array ops; only the actual drawing
+    # stays a per-box loop (no batched cv2 API)
+    try:
+        text = label_path.read_text()
+    except OSError:
+        text = ""
+
+    arr = None
+    if text:
+        # fromstring raises ValueError on a non-numeric token (rather than
+        # just stopping early); a validation tool must survive bad labels,
+        # so treat that like any other malformed file
+        try:
+            flat = np.fromstring(text, dtype=np.float32, sep=" ")
+        except ValueError:
+            flat = np.empty(0, dtype=np.float32)
+        # a well-formed YOLO file is a flat run of 5-value rows; anything
+        # else (truncated line, stray token) fails the % 5 check
+        if flat.size > 0 and flat.size % 5 == 0:
+            arr = flat.reshape(-1, 5)
+
     boxes_drawn = 0
-    with label_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) != 5:
-                continue
-            
-            try:
-                class_id = int(parts[0])
-                x_center = float(parts[1])
-                y_center = float(parts[2])
-                width = float(parts[3])
-                height = float(parts[4])
-                
-                # Convert from normalized to pixel coordinates
-                x1 = int((x_center - width / 2) * w)
-                y1 = int((y_center - height / 2) * h)
-                x2 = int((x_center + width / 2) * w)
-                y2 = int((y_center + height / 2) * h)
-                
-                # Draw bounding box
-                cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(img, "Laptop", (x1, y1 - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                boxes_drawn += 1
-            except (ValueError, IndexError):
-                continue
-    
+    if arr is not None:
+        x_center, y_center = arr[:, 1], arr[:, 2]
+        width, height = arr[:, 3], arr[:, 4]
+
+        # Clip to the image up front so cv2.rectangle never has to clip
+        # out-of-bounds segments itself (labels slightly past the border
+        # are common after augmentation/rounding)
+        x1 = np.clip((x_center - width / 2) * w, 0, w - 1).astype(np.int32)
+        y1 = np.clip((y_center - height / 2) * h, 0, h - 1).astype(np.int32)
+        x2 = np.clip((x_center + width / 2) * w, 0, w - 1).astype(np.int32)
+        y2 = np.clip((y_center + height / 2) * h, 0, h - 1).astype(np.int32)
+
+        for bx1, by1, bx2, by2 in zip(x1.tolist(), y1.tolist(),
+                                      x2.tolist(), y2.tolist()):
+            # Draw bounding box; LINE_4 skips anti-aliased/8-connected
+            # rasterization these straight green lines don't need
+            cv2.rectangle(img, (bx1, by1), (bx2, by2), (0, 255, 0), 2,
+                          cv2.LINE_4)
+            # baseline sits 10px above the box, same spot putText used
+            _blit_label(img, bx1, by1 - 10 - _LABEL_ASCENT)
+        boxes_drawn = len(arr)
+
+
     if output_path:
-        cv2.imwrite(str(output_path), img)
+        # review copies only: quality 80 without the optimize pass encodes
+        # noticeably faster and smaller than the imwrite default of 95
+        cv2.imwrite(str(output_path), img,
+                    [cv2.IMWRITE_JPEG_QUALITY, 80, cv2.IMWRITE_JPEG_OPTIMIZE, 0])
     
     return img, boxes_drawn
 
@@ -73,18 +192,13 @@ def validate_sample_images(dataset_dir: Path, num_samples: int = 20):
         dataset_dir: Directory containing images and labels
         num_samples: Number of random images to check
     """
-    import random
-    
-    # Find all image files
-    image_files = list(dataset_dir.glob("*.jpg")) + list(dataset_dir.glob("*.jpeg"))
-    if not image_files:
+    # Reservoir-sample in one scandir pass (seeded local RNG, O(k) memory;
+    # Path objects only for the chosen samples)
+    sample_images = [Path(p) for p in _sample_images(dataset_dir, num_samples)]
+    if not sample_images:
         print(f"No images found in {dataset_dir}")
         return
-    
-    # Randomly sample
-    random.seed(42)
-    sample_images = random.sample(image_files, min(num_samples, len(image_files)))
-    
+
     print("=" * 60)
     print(f"Validating {len(sample_images)} sample images")
     print("=" * 60)
@@ -97,13 +211,18 @@ def validate_sample_images(dataset_dir: Path, num_samples: int = 20):
     
     correct_count = 0
     incorrect_count = 0
-    
+
+    # One reusable window for the whole session: creating and destroying a
+    # GUI window per image forces the window manager to re-layout every
+    # time, so just retitle the same window instead
+    window = "Validation"
+    cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+
     for img_path in sample_images:
         label_path = dataset_dir / f"{img_path.stem}.txt"
-        if not label_path.exists():
-            continue
-        
-        # Draw boxes
+
+        # Draw boxes (returns None if the label file is missing - no need
+        # for a second exists() stat here)
         result = draw_bboxes_on_image(img_path, label_path)
         if result is None:
             continue
@@ -114,14 +233,14 @@ def validate_sample_images(dataset_dir: Path, num_samples: int = 20):
             print(f"  {img_path.name}: No boxes found")
             continue
         
-        # Display image
-        cv2.imshow(f"Validation: {img_path.name} ({boxes_drawn} boxes)", img)
-        
+        # Display image in the shared window
+        cv2.setWindowTitle(window, f"Validation: {img_path.name} ({boxes_drawn} boxes)")
+        cv2.imshow(window, img)
+
         print(f"  {img_path.name}: {boxes_drawn} box(es) - Correct? (y/n/q): ", end="")
-        
+
         key = cv2.waitKey(0) & 0xFF
-        cv2.destroyAllWindows()
-        
+
         if key == ord('q'):
             break
         elif key == ord('y'):
@@ -132,7 +251,9 @@ def validate_sample_images(dataset_dir: Path, num_samples: int = 20):
             print("✗ Incorrect")
         else:
             print("Skipped")
-    
+
+    cv2.destroyAllWindows()
+
     print()
     print("=" * 60)
     print("Validation Summary")
@@ -154,39 +275,35 @@ def save_validation_samples(dataset_dir: Path, output_dir: Path, num_samples: in
         output_dir: Directory to save annotated images
         num_samples: Number of random images to save
     """
-    import random
-    
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Find all image files
-    image_files = list(dataset_dir.glob("*.jpg")) + list(dataset_dir.glob("*.jpeg"))
-    if not image_files:
+
+    # Reservoir-sample in one scandir pass (seeded local RNG, O(k) memory;
+    # Path objects only for the chosen samples)
+    sample_images = [Path(p) for p in _sample_images(dataset_dir, num_samples)]
+    if not sample_images:
         print(f"No images found in {dataset_dir}")
         return
-    
-    # Randomly sample
-    random.seed(42)
-    sample_images = random.sample(image_files, min(num_samples, len(image_files)))
-    
+
     print(f"Saving {len(sample_images)} validation samples to {output_dir}")
-    
-    for img_path in sample_images:
-        label_path = dataset_dir / f"{img_path.stem}.txt"
-        if not label_path.exists():
-            continue
-        
-        output_path = output_dir / f"{img_path.stem}_bboxes.jpg"
-        draw_bboxes_on_image(img_path, label_path, output_path)
-    
+
+    # draw_bboxes_on_image already handles a missing label file (returns
+    # None), so no exists() stat per sample here
+    tasks = [(img_path, dataset_dir / f"{img_path.stem}.txt",
+              output_dir / f"{img_path.stem}_bboxes.jpg")
+             for img_path in sample_images]
+
+    # Decode, draw, and encode all release the GIL inside OpenCV and each
+    # task writes its own file, so this batch job threads cleanly
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 4)) as executor:
+        list(executor.map(lambda t: draw_bboxes_on_image(*t), tasks))
+
     print(f"Saved validation samples to: {output_dir}")
 
 
-def main():
-    """Main function."""
-    from pathlib import Path
-    
+def _interactive_main():
+    """Original prompt-driven flow, kept for a bare `python validate_bboxes.py`."""
     project_root = Path(__file__).resolve().parent
-    
+
     # You can validate either original or cleaned dataset
     print("Which dataset to validate?")
     print("  1. Original dataset (Laptop)")
@@ -222,6 +339,46 @@ def main():
         print("Invalid choice")
 
 
+def main():
+    """Main function."""
+    # No arguments keeps the original interactive prompts; any flag
+    # switches to the non-blocking CLI so cron/CI can run this headless
+    if len(sys.argv) == 1:
+        _interactive_main()
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Visually validate YOLO bounding boxes on sample images.")
+    parser.add_argument("--dataset", choices=("original", "cleaned"),
+                        default="cleaned",
+                        help="which dataset to validate (default: cleaned)")
+    parser.add_argument("--mode", choices=("interactive", "save"),
+                        default="save",
+                        help="review images on screen or save annotated "
+                             "samples (default: save)")
+    parser.add_argument("--num-samples", type=int, default=None,
+                        help="number of random samples (default: 20 "
+                             "interactive, 10 save)")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="where to save annotated samples "
+                             "(default: ./validation_samples)")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    folder = "Laptop" if args.dataset == "original" else "Laptop_cleaned"
+    dataset_dir = project_root / "OID" / "Dataset" / "train" / folder
+
+    if not dataset_dir.exists():
+        print(f"Dataset directory not found: {dataset_dir}")
+        return
+
+    if args.mode == "interactive":
+        validate_sample_images(dataset_dir, args.num_samples or 20)
+    else:
+        output_dir = args.output_dir or project_root / "validation_samples"
+        save_validation_samples(dataset_dir, output_dir, args.num_samples or 10)
+
+
 if __name__ == "__main__":
     main()
 
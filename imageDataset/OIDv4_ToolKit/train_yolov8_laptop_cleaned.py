@@ -7,43 +7,21 @@ Use this to compare performance: original dataset vs cleaned dataset.
 
 from pathlib import Path
 
-from ultralytics import YOLO
+from _train_common import train
 
 
 def main() -> None:
     project_root = Path(__file__).resolve().parent
 
-    # Data config (points to Laptop_cleaned_splits folders)
-    data_yaml = project_root / "laptop_cleaned.yaml"
-
-    if not data_yaml.exists():
-        raise FileNotFoundError(f"Data config not found: {data_yaml}")
-
-    # Start from a small pretrained YOLOv8 model
-    model = YOLO("yolov8n.pt")
-
-    # Train on cleaned dataset
     print("=" * 60)
     print("Training YOLOv8 on CLEANED Laptop Dataset")
     print("=" * 60)
-    print(f"Data config: {data_yaml}")
     print()
 
-    model.train(
-        data=str(data_yaml),
-        epochs=50,
-        imgsz=640,
-        batch=16,
-        project=str(project_root / "runs"),
-        name="yolov8n-laptop-cleaned",  # Different name to distinguish from original
-    )
-
-    # Evaluate on test set
-    print()
-    print("=" * 60)
-    print("Evaluating on Test Set")
-    print("=" * 60)
-    model.val(data=str(data_yaml), split="test", imgsz=640, batch=16)
+    # Data config (points to Laptop_cleaned_splits folders); run name
+    # distinguishes this run from the original-dataset one
+    train(project_root / "laptop_cleaned.yaml", "yolov8n-laptop-cleaned",
+          project_root)
 
     print()
     print("=" * 60)
@@ -58,4 +36,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-